@@ -1,18 +1,73 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import Optional
+import asyncio
+import math
+import os
+from collections import OrderedDict
 import joblib
-import pandas as pd
 import numpy as np
 
-from src.preprocess import clean_raw_df
+from src.utils import DEFAULTS, DEP_MAP
 
-app = FastAPI()
+# orjson (C) serialization for every response instead of the stdlib json encoder
+app = FastAPI(default_response_class=ORJSONResponse)
 
-# Load model and features once on startup
-model = joblib.load("models/model.pkl")
+# Load model weights, features and preprocess params once on startup.
+# The model is a logistic regression, so inference only needs its coefficients
+# and intercept (see train_and_save). mmap_mode='r' maps the coefficient array
+# from the page cache so multiple uvicorn workers share it.
+weights = joblib.load("models/model_weights.pkl", mmap_mode='r')
+COEF = weights['coef']
+INTERCEPT = weights['intercept']
 feature_cols = joblib.load("models/features.pkl")
+params = joblib.load("models/preprocess_params.pkl")
+
+# MODEL_BACKEND=onnx scores with the exported ONNX graph (models/model.onnx) through
+# onnxruntime instead of the raw weights; works for any sklearn model train_and_save exports.
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "numpy")
+onnx_session = None
+if MODEL_BACKEND == "onnx":
+    import onnxruntime as ort
+    onnx_session = ort.InferenceSession("models/model.onnx", providers=["CPUExecutionProvider"])
+
+# Micro-batching of /predict scoring (see _batcher). Off by default: scoring is a
+# 16-weight dot product, so there is little per-call overhead to amortize and a
+# deadline only adds latency. BATCH_SIZE>1 enables it; with BATCH_TIMEOUT_MS=0 the
+# batcher only takes what is already queued and never waits.
+BATCH_SIZE = int(os.getenv("BATCH_SIZE", "1"))
+BATCH_TIMEOUT_MS = float(os.getenv("BATCH_TIMEOUT_MS", "0"))
+CACHE_SIZE = 4096
+
+# Column positions of the model inputs, fixed by the saved feature list
+N_FEATURES = len(feature_cols)
+IDX_GENDER = feature_cols.index('Gender')
+IDX_MARRIED = feature_cols.index('Married')
+IDX_DEPENDENTS = feature_cols.index('Dependents')
+IDX_EDUCATION = feature_cols.index('Education')
+IDX_SELF_EMPLOYED = feature_cols.index('Self_Employed')
+IDX_APPLICANT = feature_cols.index('ApplicantIncome')
+IDX_COAPP = feature_cols.index('CoapplicantIncome')
+IDX_LOAN = feature_cols.index('LoanAmount')
+IDX_TERM = feature_cols.index('Loan_Amount_Term')
+IDX_CREDIT = feature_cols.index('Credit_History')
+IDX_TOTAL = feature_cols.index('TotalIncome')
+IDX_INCOME_LOAN = feature_cols.index('Income_to_Loan_Ratio')
+IDX_APP_COAPP = feature_cols.index('Applicant_to_Coapp_Ratio')
+IDX_PROPERTY = {
+    'Rural': feature_cols.index('Property_Rural'),
+    'Semiurban': feature_cols.index('Property_Semiurban'),
+    'Urban': feature_cols.index('Property_Urban'),
+}
+
+# LoanAmount IQR bounds, same as the capping step in clean_raw_df
+_loan_iqr = params['loan_q3'] - params['loan_q1']
+LOAN_LOWER = params['loan_q1'] - 1.5 * _loan_iqr
+LOAN_UPPER = params['loan_q3'] + 1.5 * _loan_iqr
+APPLICANT_CAP = params['applicant_cap']
+DEPS_DEFAULT = DEP_MAP.get(params['deps_mode'], DEP_MAP[DEFAULTS['Dependents']])
 
 
 app.add_middleware(
@@ -36,18 +91,178 @@ class LoanApplication(BaseModel):
     Credit_History: Optional[float]    # 1.0, 0.0, or None
     Property_Area: str        # "Urban", "Semiurban", "Rural"
   
-@app.post("/predict")
-def predict_loan_status(application: LoanApplication):
-    df = pd.DataFrame([application.model_dump()])
-    df_clean = clean_raw_df(df)
-    X_new = df_clean.drop(columns=['Loan_ID', 'Loan_Status'], errors='ignore')
-    pred_class = model.predict(X_new)[0]
-    pred_prob = model.predict_proba(X_new)[0][1]
 
-    prediction = int(pred_prob >= 0.5)  # Threshold 0.5 , should I use this?
+def _missing(x: Optional[float]) -> bool:
+    return x is None or math.isnan(x)
+
+
+def featurize(app: LoanApplication, params: dict, out: np.ndarray) -> np.ndarray:
+    """
+    Write the model features for one application into row 0 of `out`.
+    Mirrors clean_raw_df (same imputations, engineered features and caps)
+    without building a DataFrame, so the request path stays pure Python/NumPy.
+    """
+    row = out[0]
+
+    # Required str fields: never missing, and anything other than the positive token
+    # (including '') encodes to 0, as in clean_raw_df
+    row[IDX_GENDER] = 1.0 if app.Gender == 'Male' else 0.0
+    row[IDX_MARRIED] = 1.0 if app.Married == 'Yes' else 0.0
+    row[IDX_EDUCATION] = 1.0 if app.Education == 'Graduate' else 0.0
+    row[IDX_SELF_EMPLOYED] = 1.0 if app.Self_Employed == 'Yes' else 0.0
+
+    # Dependents: '3+' -> 3, missing/unknown -> training mode
+    row[IDX_DEPENDENTS] = DEP_MAP.get(app.Dependents, DEPS_DEFAULT)
+
+    # Numeric fields: None and NaN (pydantic accepts NaN for floats) are both missing,
+    # as for fillna in clean_raw_df
+    applicant = 0.0 if _missing(app.ApplicantIncome) else app.ApplicantIncome
+    coapp = 0.0 if _missing(app.CoapplicantIncome) else app.CoapplicantIncome
+    # missing or zero LoanAmount -> training median
+    loan = params['loan_median'] if _missing(app.LoanAmount) or app.LoanAmount == 0 else app.LoanAmount
+    row[IDX_TERM] = params['term_mode'] if _missing(app.Loan_Amount_Term) else app.Loan_Amount_Term
+    row[IDX_CREDIT] = params['ch_mode'] if _missing(app.Credit_History) else app.Credit_History
+
+    # Engineered features use the values before outlier capping
+    total = applicant + coapp
+    row[IDX_TOTAL] = total
+    row[IDX_INCOME_LOAN] = total / loan
+    row[IDX_APP_COAPP] = applicant if coapp == 0 else applicant / coapp
+
+    # Outlier capping
+    row[IDX_APPLICANT] = APPLICANT_CAP if applicant > APPLICANT_CAP else applicant
+    row[IDX_COAPP] = coapp
+    row[IDX_LOAN] = min(max(loan, LOAN_LOWER), LOAN_UPPER)
+
+    for idx in IDX_PROPERTY.values():
+        row[idx] = 0.0
+    if app.Property_Area in IDX_PROPERTY:
+        row[IDX_PROPERTY[app.Property_Area]] = 1.0
+
+    return out
+
+
+def _score(X: np.ndarray) -> np.ndarray:
+    """Probability of class 1 for a batch of float32 feature rows."""
+    if onnx_session is not None:
+        # outputs are (label, probabilities); zipmap is disabled at export
+        return onnx_session.run(None, {"X": X})[1][:, 1]
+    z = X @ COEF + INTERCEPT
+    # sigmoid written via tanh: no overflow for large |z|
+    return 0.5 * (1.0 + np.tanh(0.5 * z))
+
+
+# Repeated applications featurize to identical vectors, so results are cached on
+# the vector bytes. Only touched from the event loop, so no lock is needed; the
+# cache lives as long as the process (i.e. until the model is reloaded).
+_cache: OrderedDict = OrderedDict()
+
+
+def _cache_get(key: bytes):
+    result = _cache.get(key)
+    if result is not None:
+        _cache.move_to_end(key)
+    return result
+
+
+def _cache_put(key: bytes, result: tuple) -> None:
+    _cache[key] = result
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+_queue: Optional[asyncio.Queue] = None
+_batcher_task: Optional[asyncio.Task] = None
+
+
+async def _batcher():
+    """
+    Collect up to BATCH_SIZE queued feature vectors (waiting at most
+    BATCH_TIMEOUT_MS after the first one), score them in one matrix product
+    off the event loop and resolve each request's future.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await _queue.get()]
+        deadline = loop.time() + BATCH_TIMEOUT_MS / 1000
+        while len(batch) < BATCH_SIZE:
+            try:
+                batch.append(_queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        X = np.vstack([vec for vec, _ in batch])
+        try:
+            probs = await asyncio.to_thread(_score, X)
+        except Exception as exc:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(exc)
+            continue
+        for (_, fut), prob in zip(batch, probs):
+            if not fut.done():
+                fut.set_result(float(prob))
+
+
+async def _batch_infer(vec: np.ndarray) -> float:
+    """Probability for one feature vector, scored off the event loop."""
+    if _queue is None:
+        # batching disabled: score this row alone in the default thread pool
+        probs = await asyncio.to_thread(_score, vec[np.newaxis, :])
+        return float(probs[0])
+    fut = asyncio.get_running_loop().create_future()
+    await _queue.put((vec, fut))
+    return await fut
+
+
+@app.on_event("startup")
+def _warm():
+    """Fail fast on a feature-count mismatch and run one dummy prediction so the first request doesn't pay cold-start costs."""
+    if COEF.shape[0] != N_FEATURES:
+        raise RuntimeError(
+            f"Model expects {COEF.shape[0]} features but features.pkl lists {N_FEATURES}; retrain or redeploy models/"
+        )
+    dummy = np.zeros((1, N_FEATURES), dtype=np.float32)
+    _score(dummy)
+
+
+@app.on_event("startup")
+async def _start_batcher():
+    global _queue, _batcher_task
+    if BATCH_SIZE <= 1:
+        return
+    _queue = asyncio.Queue()
+    _batcher_task = asyncio.create_task(_batcher())
+
+
+@app.on_event("shutdown")
+async def _stop_batcher():
+    if _batcher_task is not None:
+        _batcher_task.cancel()
+
+
+@app.post("/predict")
+async def predict_loan_status(application: LoanApplication):
+    X_new = featurize(application, params, np.empty((1, N_FEATURES), dtype=np.float32))
+    key = X_new.tobytes()
+    result = _cache_get(key)
+    if result is None:
+        prob = await _batch_infer(X_new[0])
+        # same decision rule as model.predict (class 1 only when strictly above 0.5)
+        result = (prob > 0.5, prob)
+        _cache_put(key, result)
+    pred_class, pred_prob = result
 
+    # pred_prob is already a Python float; prediction stays a 0/1 int (not a JSON bool)
     return {
         "prediction": int(pred_class),
-        "probability": float(pred_prob)
+        "probability": pred_prob
     }
-   
@@ -2,7 +2,131 @@
 import pandas as pd
 import numpy as np
 
-def clean_raw_df(df: pd.DataFrame) -> pd.DataFrame:
+try:
+    from numba import njit
+except ImportError:  # numba is optional; clean_raw_df falls back to plain NumPy
+    njit = None
+
+try:
+    import polars as pl
+except ImportError:  # polars is optional; only needed for clean_raw_lazy
+    pl = None
+
+from src.utils import DEFAULTS, DEP_MAP
+
+# 0/1 flags and small counts; the training frame stores these as int8
+INT8_COLS = [
+    'Gender', 'Married', 'Dependents', 'Education', 'Self_Employed', 'Credit_History',
+    'Property_Rural', 'Property_Semiurban', 'Property_Urban',
+]
+
+# Continuous columns stored as float32 after cleaning
+FLOAT32_COLS = [
+    'ApplicantIncome', 'CoapplicantIncome', 'LoanAmount',
+    'TotalIncome', 'Income_to_Loan_Ratio', 'Applicant_to_Coapp_Ratio',
+]
+
+
+def _column_mode(s: pd.Series, default):
+    """Mode of a column, or `default` when the column is entirely missing."""
+    mode = s.mode()
+    return mode[0] if not mode.empty else default
+
+
+def _engineer_numeric_np(applicant: np.ndarray, coapp: np.ndarray, loan: np.ndarray):
+    """NumPy version of _engineer_numeric, used when numba is not installed."""
+    total = applicant + coapp
+    inc_loan_ratio = total / loan
+    # dividing by 1 where there is no coapplicant income gives ratio = applicant income,
+    # without computing (and warning on) applicant / 0
+    app_coapp_ratio = applicant / np.where(coapp == 0, 1.0, coapp)
+    return total, inc_loan_ratio, app_coapp_ratio
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _engineer_numeric(applicant, coapp, loan):
+        """
+        TotalIncome, Income_to_Loan_Ratio and Applicant_to_Coapp_Ratio in one pass.
+        Inputs are imputed float64 arrays; LoanAmount must already be non-zero.
+        """
+        n = applicant.shape[0]
+        total = np.empty(n)
+        inc_loan_ratio = np.empty(n)
+        app_coapp_ratio = np.empty(n)
+        for i in range(n):
+            total[i] = applicant[i] + coapp[i]
+            inc_loan_ratio[i] = total[i] / loan[i]
+            # no coapplicant income -> ratio = applicant income
+            app_coapp_ratio[i] = applicant[i] / coapp[i] if coapp[i] != 0 else applicant[i]
+        return total, inc_loan_ratio, app_coapp_ratio
+else:
+    _engineer_numeric = _engineer_numeric_np
+
+
+def fit_preprocess_params(df_raw: pd.DataFrame) -> dict:
+    """
+    Compute the imputation values and outlier caps used by clean_raw_df.
+    Run once on the raw training data (inside train_and_save) and persist the
+    result, so inference applies the training statistics instead of
+    recomputing them on a single request row.
+    Returns a dict of plain Python scalars:
+    loan_median, term_mode, ch_mode, gender_mode, married_mode, deps_mode,
+    applicant_cap, loan_q1, loan_q3
+    """
+    loan_median = float(df_raw['LoanAmount'].median())
+
+    # caps are computed on the imputed columns, same order as clean_raw_df
+    applicant = df_raw['ApplicantIncome'].fillna(0)
+    loan = df_raw['LoanAmount'].fillna(loan_median).replace(0, loan_median)
+
+    return {
+        'loan_median': loan_median,
+        'term_mode': float(_column_mode(df_raw['Loan_Amount_Term'], DEFAULTS['Loan_Amount_Term'])),
+        'ch_mode': float(_column_mode(df_raw['Credit_History'], DEFAULTS['Credit_History'])),
+        'gender_mode': str(_column_mode(df_raw['Gender'], DEFAULTS['Gender'])),
+        'married_mode': str(_column_mode(df_raw['Married'], DEFAULTS['Married'])),
+        'deps_mode': str(_column_mode(df_raw['Dependents'], DEFAULTS['Dependents'])),
+        'applicant_cap': float(applicant.quantile(0.99)),
+        'loan_q1': float(loan.quantile(0.25)),
+        'loan_q3': float(loan.quantile(0.75)),
+    }
+
+
+def _column_mode_pl(s: "pl.Series", default):
+    """Polars counterpart of _column_mode (smallest value on ties, like pandas)."""
+    modes = s.drop_nulls().mode()
+    return modes.sort()[0] if len(modes) else default
+
+
+def fit_preprocess_params_polars(df_raw: "pl.DataFrame") -> dict:
+    """
+    Polars version of fit_preprocess_params, used by the polars training engine so the
+    raw CSV never has to be converted to pandas. Returns the same dict.
+    """
+    if pl is None:
+        raise ImportError("fit_preprocess_params_polars requires polars (pip install polars)")
+
+    loan_median = float(df_raw['LoanAmount'].median())
+
+    # caps are computed on the imputed columns, same order as clean_raw_df
+    applicant = df_raw['ApplicantIncome'].fill_null(0)
+    loan = df_raw['LoanAmount'].cast(pl.Float64).fill_null(loan_median).replace(0, loan_median)
+
+    return {
+        'loan_median': loan_median,
+        'term_mode': float(_column_mode_pl(df_raw['Loan_Amount_Term'], DEFAULTS['Loan_Amount_Term'])),
+        'ch_mode': float(_column_mode_pl(df_raw['Credit_History'], DEFAULTS['Credit_History'])),
+        'gender_mode': str(_column_mode_pl(df_raw['Gender'], DEFAULTS['Gender'])),
+        'married_mode': str(_column_mode_pl(df_raw['Married'], DEFAULTS['Married'])),
+        'deps_mode': str(_column_mode_pl(df_raw['Dependents'], DEFAULTS['Dependents'])),
+        'applicant_cap': float(applicant.quantile(0.99, interpolation='linear')),
+        'loan_q1': float(loan.quantile(0.25, interpolation='linear')),
+        'loan_q3': float(loan.quantile(0.75, interpolation='linear')),
+    }
+
+
+def clean_raw_df(df: pd.DataFrame, params: dict, copy: bool = True) -> pd.DataFrame:
     """
     Clean raw loan DataFrame and produce engineered features needed for training/inference.
     - Imputes missing values (LoanAmount, Credit_History, Self_Employed, Gender, Married, Dependents, Loan_Amount_Term)
@@ -10,133 +134,104 @@ def clean_raw_df(df: pd.DataFrame) -> pd.DataFrame:
     - Creates TotalIncome and Income_to_Loan_Ratio (safe from div-by-zero)
     - Caps ApplicantIncome (99th percentile) and LoanAmount (IQR method)
     - Encodes simple binary columns to 0/1 and one-hot encodes Property_Area
-    Returns a new DataFrame (does not modify input).
+    All statistics (medians, modes, caps) come from `params`, see fit_preprocess_params.
+    Returns a new DataFrame (does not modify input) unless copy=False, in which case
+    the input frame is cleaned in place; only use that for single-use frames.
     """
-    df = df.copy()
+    if copy:
+        df = df.copy()
 
     # ---------------------
     # 1) Basic imputations
     # ---------------------
-    # Numeric imputations
-    if 'LoanAmount' in df.columns:
-        df['LoanAmount'] = df['LoanAmount'].fillna(df['LoanAmount'].median())
-
-    if 'ApplicantIncome' in df.columns:
-        df['ApplicantIncome'] = df['ApplicantIncome'].fillna(0)
-
-    if 'CoapplicantIncome' in df.columns:
-        df['CoapplicantIncome'] = df['CoapplicantIncome'].fillna(0)
-
-    if 'Loan_Amount_Term' in df.columns:
-        df['Loan_Amount_Term'] = df['Loan_Amount_Term'].fillna(df['Loan_Amount_Term'].mode()[0])
-
-    # Categorical imputations (use mode or domain default)
-    if 'Credit_History' in df.columns:
-        if not df['Credit_History'].mode().empty:
-            df['Credit_History'] = df['Credit_History'].fillna(df['Credit_History'].mode()[0])
-        else:
-            df['Credit_History'] = df['Credit_History'].fillna(1.0)
-
-    if 'Self_Employed' in df.columns:
-        df['Self_Employed'] = df['Self_Employed'].fillna('No')
-
-    if 'Gender' in df.columns:
-        df['Gender'] = df['Gender'].fillna(df['Gender'].mode()[0])
-
-    if 'Married' in df.columns:
-        df['Married'] = df['Married'].fillna(df['Married'].mode()[0])
-
-    if 'Dependents' in df.columns:
-        df['Dependents'] = df['Dependents'].fillna(df['Dependents'].mode()[0])
+    # Numeric imputations (training median/mode), then categorical ones (training mode or
+    # domain default); one in-place fillna instead of a new Series per column
+    fill_values = {
+        'LoanAmount': params['loan_median'],
+        'ApplicantIncome': 0,
+        'CoapplicantIncome': 0,
+        'Loan_Amount_Term': params['term_mode'],
+        'Credit_History': params['ch_mode'],
+        'Self_Employed': 'No',
+        'Gender': params['gender_mode'],
+        'Married': params['married_mode'],
+        'Dependents': params['deps_mode'],
+    }
+    df.fillna({c: v for c, v in fill_values.items() if c in df.columns}, inplace=True)
 
     # ---------------------
     # 2) Dependents cleanup
     # ---------------------
     if 'Dependents' in df.columns:
-        # Convert '3+' to '3' then to int
-        df['Dependents'] = df['Dependents'].astype(str).replace('3+', '3')
-        # If some non-numeric values remain, coerce and fill with mode
-        df['Dependents'] = pd.to_numeric(df['Dependents'], errors='coerce')
-        if df['Dependents'].isnull().any():
-            df['Dependents'] = df['Dependents'].fillna(df['Dependents'].mode()[0])
-        df['Dependents'] = df['Dependents'].astype(int)
+        # Direct lookup ('3+' -> 3); unknown values -> training mode
+        deps_default = DEP_MAP.get(params['deps_mode'], DEP_MAP[DEFAULTS['Dependents']])
+        df['Dependents'] = df['Dependents'].map(DEP_MAP).fillna(deps_default).astype(np.int8)
 
     # ---------------------
     # 3) Engineered numeric features (after imputations)
     # ---------------------
-    # Total income
-    if {'ApplicantIncome', 'CoapplicantIncome'}.issubset(df.columns):
-        df['TotalIncome'] = df['ApplicantIncome'] + df['CoapplicantIncome']
-    else:
-        df['TotalIncome'] = np.nan
-
     # Ensure LoanAmount is not zero/NaN (we already filled with median)
     if 'LoanAmount' in df.columns:
         # replace any zero with median to avoid divide by zero
-        loan_median = df['LoanAmount'].median() if not df['LoanAmount'].isnull().all() else 1.0
-        df['LoanAmount'] = df['LoanAmount'].replace(0, loan_median)
-        # Income to loan ratio
-        df['Income_to_Loan_Ratio'] = df['TotalIncome'] / df['LoanAmount']
-    else:
-        df['Income_to_Loan_Ratio'] = np.nan
+        df['LoanAmount'] = df['LoanAmount'].replace(0, params['loan_median'])
 
-    # safe applicant/coapplicant ratio (applicant / coapplicant). coapplicant may be zero -> use np.where
-    if {'ApplicantIncome','CoapplicantIncome'}.issubset(df.columns):
-        df['Applicant_to_Coapp_Ratio'] = np.where(
-            df['CoapplicantIncome'] == 0,
-            df['ApplicantIncome'],  # if no coapplicant income, ratio = applicant income (or set to a big number)
-            df['ApplicantIncome'] / df['CoapplicantIncome']
+    # TotalIncome, Income_to_Loan_Ratio and the safe applicant/coapplicant ratio
+    # (coapplicant may be zero -> ratio = applicant income), computed in one kernel.
+    # Only Income_to_Loan_Ratio needs LoanAmount; without it the kernel divides by 1
+    # and that output is discarded.
+    if {'ApplicantIncome', 'CoapplicantIncome'}.issubset(df.columns):
+        has_loan = 'LoanAmount' in df.columns
+        total, inc_loan_ratio, app_coapp_ratio = _engineer_numeric(
+            df['ApplicantIncome'].to_numpy(dtype=np.float64),
+            df['CoapplicantIncome'].to_numpy(dtype=np.float64),
+            df['LoanAmount'].to_numpy(dtype=np.float64) if has_loan else np.ones(len(df)),
         )
+        df['TotalIncome'] = total
+        df['Income_to_Loan_Ratio'] = inc_loan_ratio if has_loan else np.nan
+        df['Applicant_to_Coapp_Ratio'] = app_coapp_ratio
+    else:
+        df['TotalIncome'] = np.nan
+        df['Income_to_Loan_Ratio'] = np.nan
 
     # ---------------------
     # 4) Outlier capping
     # ---------------------
     # ApplicantIncome: cap at 99th percentile
     if 'ApplicantIncome' in df.columns:
-        cap_val = df['ApplicantIncome'].quantile(0.99)
-        df.loc[df['ApplicantIncome'] > cap_val, 'ApplicantIncome'] = int(cap_val)
+        df['ApplicantIncome'] = df['ApplicantIncome'].clip(upper=params['applicant_cap'])
 
     # LoanAmount: cap using IQR
     if 'LoanAmount' in df.columns:
-        Q1 = df['LoanAmount'].quantile(0.25)
-        Q3 = df['LoanAmount'].quantile(0.75)
+        Q1 = params['loan_q1']
+        Q3 = params['loan_q3']
         IQR = Q3 - Q1
-        lower = Q1 - 1.5 * IQR
-        upper = Q3 + 1.5 * IQR
-        df.loc[df['LoanAmount'] < lower, 'LoanAmount'] = lower
-        df.loc[df['LoanAmount'] > upper, 'LoanAmount'] = upper
+        df['LoanAmount'] = df['LoanAmount'].clip(lower=Q1 - 1.5 * IQR, upper=Q3 + 1.5 * IQR)
 
     # ---------------------
     # 5) Categorical mappings (clear & consistent)
     # ---------------------
-    # Binary maps (choose convention: 1 = positive / Yes / Male)
+    # Binary maps (choose convention: 1 = positive / Yes / Male); anything else -> 0
     if 'Gender' in df.columns:
-        df['Gender'] = df['Gender'].map({'Male': 1, 'Female': 0}).fillna(0).astype(int)
+        df['Gender'] = (df['Gender'].to_numpy() == 'Male').astype(np.int8)
 
     if 'Married' in df.columns:
-        df['Married'] = df['Married'].map({'Yes': 1, 'No': 0}).fillna(0).astype(int)
+        df['Married'] = (df['Married'].to_numpy() == 'Yes').astype(np.int8)
 
     if 'Education' in df.columns:
-        df['Education'] = df['Education'].map({'Graduate': 1, 'Not Graduate': 0}).fillna(0).astype(int)
+        df['Education'] = (df['Education'].to_numpy() == 'Graduate').astype(np.int8)
 
     if 'Self_Employed' in df.columns:
-        df['Self_Employed'] = df['Self_Employed'].map({'Yes': 1, 'No': 0}).fillna(0).astype(int)
+        df['Self_Employed'] = (df['Self_Employed'].to_numpy() == 'Yes').astype(np.int8)
 
     # ---------------------
     # 6) One-hot encode Property_Area (keeps deterministic columns)
     # ---------------------
     if 'Property_Area' in df.columns:
-        prop_dummies = pd.get_dummies(df['Property_Area'], prefix='Property')
-        # ensure consistent columns appear even if some categories are missing
-        for col in ['Property_Rural','Property_Semiurban','Property_Urban']:
-            if col not in prop_dummies.columns:
-                prop_dummies[col] = 0
-        # attach and drop original
-        df = pd.concat([df.drop(columns=['Property_Area']), prop_dummies[['Property_Rural','Property_Semiurban','Property_Urban']]], axis=1)
-        # cast to int
-        df['Property_Rural'] = df['Property_Rural'].astype(int)
-        df['Property_Semiurban'] = df['Property_Semiurban'].astype(int)
-        df['Property_Urban'] = df['Property_Urban'].astype(int)
+        # one vectorized comparison per category; always writes all three columns
+        areas = df['Property_Area'].to_numpy()
+        for area in ('Rural', 'Semiurban', 'Urban'):
+            df[f'Property_{area}'] = (areas == area).astype(np.int8)
+        df.drop(columns=['Property_Area'], inplace=True)
 
     # ---------------------
     # 7) Target mapping if present (optional)
@@ -145,5 +240,78 @@ def clean_raw_df(df: pd.DataFrame) -> pd.DataFrame:
         # Map 'Y' -> 1, 'N' -> 0. If you used a different mapping before, keep consistent.
         df['Loan_Status'] = df['Loan_Status'].map({'Y': 1, 'N': 0})
 
+    # Incomes, amounts and ratios fit in float32 (the model's input dtype)
+    float_cols = [c for c in FLOAT32_COLS if c in df.columns]
+    df[float_cols] = df[float_cols].astype(np.float32)
+
     # final: return cleaned df
     return df
+
+
+# Raw numeric columns with missing/decimal values; read them as Float64 for clean_raw_lazy,
+# polars would otherwise infer i64 from the first rows
+POLARS_FLOAT_COLS = ['CoapplicantIncome', 'LoanAmount', 'Loan_Amount_Term', 'Credit_History']
+
+
+def clean_raw_lazy(lf: "pl.LazyFrame", params: dict) -> "pl.LazyFrame":
+    """
+    Polars version of clean_raw_df for bulk (training) cleans.
+    Builds the same imputations, engineered features, caps and encodings as one
+    lazy query, so no intermediate column is materialized until .collect().
+    Produces the same columns, in the same order, as clean_raw_df.
+    """
+    if pl is None:
+        raise ImportError("clean_raw_lazy requires polars (pip install polars)")
+
+    col = pl.col
+    loan_iqr = params['loan_q3'] - params['loan_q1']
+    deps_default = DEP_MAP.get(params['deps_mode'], DEP_MAP[DEFAULTS['Dependents']])
+
+    lf = lf.with_columns(
+        # 1) Basic imputations
+        col('LoanAmount').cast(pl.Float64).fill_null(params['loan_median']),
+        col('ApplicantIncome').fill_null(0),
+        col('CoapplicantIncome').cast(pl.Float64).fill_null(0),
+        col('Loan_Amount_Term').cast(pl.Float64).fill_null(params['term_mode']),
+        col('Credit_History').cast(pl.Float64).fill_null(params['ch_mode']),
+        col('Self_Employed').fill_null('No'),
+        col('Gender').fill_null(params['gender_mode']),
+        col('Married').fill_null(params['married_mode']),
+        # 2) Dependents cleanup: '3+' -> 3, unknown -> training mode
+        col('Dependents').cast(pl.String)
+        .replace_strict({k: v for k, v in DEP_MAP.items() if isinstance(k, str)}, default=deps_default)
+        .cast(pl.Int8),
+    ).with_columns(
+        # replace any zero LoanAmount with median to avoid divide by zero
+        pl.when(col('LoanAmount') == 0).then(params['loan_median']).otherwise(col('LoanAmount')).alias('LoanAmount'),
+    ).with_columns(
+        # 3) Engineered numeric features (before capping)
+        (col('ApplicantIncome') + col('CoapplicantIncome')).alias('TotalIncome'),
+        ((col('ApplicantIncome') + col('CoapplicantIncome')) / col('LoanAmount')).alias('Income_to_Loan_Ratio'),
+        pl.when(col('CoapplicantIncome') == 0)
+        .then(col('ApplicantIncome'))
+        .otherwise(col('ApplicantIncome') / col('CoapplicantIncome'))
+        .cast(pl.Float64).alias('Applicant_to_Coapp_Ratio'),
+    ).with_columns(
+        # 4) Outlier capping
+        col('ApplicantIncome').cast(pl.Float64).clip(upper_bound=params['applicant_cap']),
+        col('LoanAmount').clip(params['loan_q1'] - 1.5 * loan_iqr, params['loan_q3'] + 1.5 * loan_iqr),
+        # 5) Binary maps (1 = Male / Yes / Graduate); anything else -> 0
+        pl.when(col('Gender') == 'Male').then(1).otherwise(0).cast(pl.Int8).alias('Gender'),
+        pl.when(col('Married') == 'Yes').then(1).otherwise(0).cast(pl.Int8).alias('Married'),
+        pl.when(col('Education') == 'Graduate').then(1).otherwise(0).cast(pl.Int8).alias('Education'),
+        pl.when(col('Self_Employed') == 'Yes').then(1).otherwise(0).cast(pl.Int8).alias('Self_Employed'),
+        # 6) One-hot Property_Area
+        *[
+            pl.when(col('Property_Area') == area).then(1).otherwise(0).cast(pl.Int8).alias(f'Property_{area}')
+            for area in ('Rural', 'Semiurban', 'Urban')
+        ],
+    ).drop('Property_Area')
+
+    # 7) Target mapping if present
+    if 'Loan_Status' in lf.collect_schema().names():
+        lf = lf.with_columns(col('Loan_Status').replace_strict({'Y': 1, 'N': 0}, default=None))
+
+    lf = lf.with_columns(pl.col(FLOAT32_COLS).cast(pl.Float32))
+
+    return lf
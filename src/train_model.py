@@ -6,23 +6,32 @@ import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import roc_auc_score, classification_report
-from src.preprocess import clean_raw_df
+from src.preprocess import (
+    INT8_COLS, POLARS_FLOAT_COLS,
+    clean_raw_df, clean_raw_lazy, fit_preprocess_params, fit_preprocess_params_polars,
+)
+from src.utils import FEATURE_COLS
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-from sklearn.model_selection import train_test_split, GridSearchCV
+from sklearn.model_selection import train_test_split
 from sklearn.impute import SimpleImputer
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
 
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, LogisticRegressionCV
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.ensemble import RandomForestClassifier
 from xgboost import XGBClassifier
 
+try:
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+except ImportError:  # skl2onnx is optional; only needed for the ONNX export (MODEL_BACKEND=onnx)
+    convert_sklearn = None
+
 from sklearn.metrics import accuracy_score, classification_report, roc_auc_score
 
 
@@ -33,15 +42,34 @@ def train_and_save(
     out_features_path: str = "models/features.pkl",
     test_size: float = 0.2,
     random_state: int = 42,
-    n_estimators: int = 100
+    n_estimators: int = 100,
+    *,
+    out_params_path: str = "models/preprocess_params.pkl",
+    out_weights_path: str = "models/model_weights.pkl",
+    out_onnx_path: str = "models/model.onnx",
+    engine: str = "pandas"
 ):
     # 1) Load raw CSV
     if not os.path.exists(raw_csv_path):
         raise FileNotFoundError(f"Training CSV not found: {raw_csv_path}")
-    df_raw = pd.read_csv(raw_csv_path)
 
-    # 2) Clean using existing preprocess function (this returns a DataFrame expected by your pipeline)
-    df = clean_raw_df(df_raw)
+    # 2) Fit imputation/cap constants on the raw data, then clean with them.
+    # The same params are saved below so inference reuses the training statistics.
+    # engine="pandas" uses clean_raw_df; engine="polars" (optional dependency, plus pyarrow)
+    # fits and cleans with Polars as one lazy query, faster on large CSVs. Both produce the same frame.
+    if engine == "polars":
+        import polars as pl
+
+        raw = pl.read_csv(raw_csv_path, schema_overrides={c: pl.Float64 for c in POLARS_FLOAT_COLS})
+        params = fit_preprocess_params_polars(raw)
+        df = clean_raw_lazy(raw.lazy(), params).collect().to_pandas()
+    elif engine == "pandas":
+        df_raw = pd.read_csv(raw_csv_path)
+        params = fit_preprocess_params(df_raw)
+        # df_raw is not used after this point, so clean it in place instead of copying.
+        df = clean_raw_df(df_raw, params, copy=False)
+    else:
+        raise ValueError(f"Unknown engine: {engine!r} (expected 'polars' or 'pandas')")
 
     # 3) Prepare target y and features X
     if 'Loan_Status' not in df.columns:
@@ -52,49 +80,57 @@ def train_and_save(
     else:
         y = df['Loan_Status'].astype(int)
 
-    # Drop ID and target; errors='ignore' in case they are missing
-    X = df.drop(columns=['Loan_ID', 'Loan_Status'], errors='ignore')
+    # Gather the model inputs in a fixed order (single column gather, no search-and-drop);
+    # app.py derives its feature positions from the saved list, so the order can't drift
+    missing = [c for c in FEATURE_COLS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Cleaned dataframe is missing feature columns: {missing}")
+    X = df[FEATURE_COLS]
 
-    # 4) Convert any remaining object/category columns to one-hot (these are columns that preprocess didn't encode)
-    # This makes the training consistent: model only receives numeric columns.
-    # Note: keep drop_first=False to preserve all categories (we will use this same scheme at inference)
-    obj_cols = X.select_dtypes(include=['object', 'category']).columns.tolist()
-    if obj_cols:
-        X = pd.get_dummies(X, columns=obj_cols, drop_first=False)
-
-    # 5) Ensure no remaining non-numeric columns
+    # 4) preprocess already encodes every categorical, so only numeric columns should remain
     non_numeric = X.select_dtypes(exclude=[np.number]).columns.tolist()
     if non_numeric:
-        raise RuntimeError(f"Non-numeric columns still present after get_dummies: {non_numeric}")
+        raise RuntimeError(f"preprocess should have encoded all categoricals, found: {non_numeric}")
+
+    # 5) Explicit dtypes: 0/1 flags and small counts as int8, everything else float32
+    # (float32 is also the dtype of the saved coefficients and of the vector built by app.py)
+    X = X.astype({c: (np.int8 if c in INT8_COLS else np.float32) for c in X.columns})
 
-    # 6) Align column order (sort for reproducibility) OR keep natural order. We'll keep natural order but save it.
-    feature_cols = X.columns.tolist()
+    # 6) Feature order is FEATURE_COLS (pinned by the gather above); saved below for app.py
+    feature_cols = list(FEATURE_COLS)
 
     # 7) Train/test split (stratify to preserve class balance)
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=test_size, stratify=y, random_state=random_state
     )
 
-    # 8) Train RandomForestClassifier on cleaned, numeric X
-    pipeline = Pipeline(steps=[
-    ("classifier", LogisticRegression(max_iter=1000))
-])
-# Param grid
-    param_grid = {
-       "classifier__C": [0.1, 1, 10],
-       "classifier__penalty": ["l1", "l2"],
-       "classifier__solver": ["liblinear"]  # compatible with l1 penalty
-    }
-
-# Grid search
-    clf = GridSearchCV(
-       pipeline,
-       param_grid,
-       cv=5,
-       scoring="roc_auc",
-       n_jobs=-1
-    )
-    clf.fit(X_train, y_train)
+    # 8) Train logistic regression, selecting C by 5-fold CV AUC.
+    # LogisticRegressionCV fits all Cs for a penalty in one call, so the old
+    # GridSearchCV over C x penalty becomes one fit per penalty; the penalty with
+    # the better mean CV AUC is kept (the test split stays untouched for evaluation).
+    clf = None
+    best_cv_auc = -np.inf
+    for penalty in ["l1", "l2"]:
+        candidate = LogisticRegressionCV(
+            Cs=[0.1, 1, 10],
+            penalty=penalty,
+            solver="liblinear",  # compatible with l1 penalty
+            cv=5,
+            scoring="roc_auc",
+            n_jobs=-1,
+            max_iter=1000,
+        )
+        candidate.fit(X_train, y_train)
+        # scores_: {positive class: (n_folds, n_Cs)} fold AUCs
+        cv_auc = next(iter(candidate.scores_.values())).mean(axis=0).max()
+        if cv_auc > best_cv_auc:
+            clf, best_cv_auc = candidate, cv_auc
+    print(f"[train_model] Best CV AUC: {best_cv_auc:.4f} (penalty={clf.penalty}, C={clf.C_[0]})")
+    # Refit a plain LogisticRegression with the selected C/penalty: the CV object also
+    # carries per-fold coefficient paths and scores that inference never needs.
+    clf = LogisticRegression(
+        C=clf.C_[0], penalty=clf.penalty, solver="liblinear", max_iter=1000
+    ).fit(X_train, y_train)
 
     # 9) Evaluate: use predicted probabilities for AUC
     probs = clf.predict_proba(X_test)[:, 1]
@@ -106,12 +142,35 @@ def train_and_save(
     print("[train_model] Classification report (test):")
     print(classification_report(y_test, preds))
 
-    # 10) Save model and feature list
+    # 10) Save model, feature list and preprocess params
     os.makedirs(os.path.dirname(out_model_path), exist_ok=True)
     joblib.dump(clf, out_model_path)
     joblib.dump(feature_cols, out_features_path)
+    joblib.dump(params, out_params_path)
+    # Raw logistic-regression weights: the API scores with a plain dot product + sigmoid
+    weights = {
+        'coef': clf.coef_.ravel().astype(np.float32),
+        'intercept': float(clf.intercept_[0]),
+    }
+    joblib.dump(weights, out_weights_path)
     print(f"[train_model] Saved model to: {out_model_path}")
     print(f"[train_model] Saved feature list to: {out_features_path}")
+    print(f"[train_model] Saved preprocess params to: {out_params_path}")
+    print(f"[train_model] Saved model weights to: {out_weights_path}")
+
+    # ONNX export of the same model for onnxruntime serving (app.py, MODEL_BACKEND=onnx).
+    # zipmap=False keeps probabilities as a plain (n, 2) tensor.
+    if convert_sklearn is None:
+        print(f"[train_model] skl2onnx not installed, skipping ONNX export to: {out_onnx_path}")
+    else:
+        onx = convert_sklearn(
+            clf,
+            initial_types=[("X", FloatTensorType([None, len(feature_cols)]))],
+            options={"zipmap": False},
+        )
+        with open(out_onnx_path, "wb") as f:
+            f.write(onx.SerializeToString())
+        print(f"[train_model] Saved ONNX model to: {out_onnx_path}")
 
     return clf, feature_cols, auc
 
@@ -121,4 +180,10 @@ if __name__ == "__main__":
     raw_csv = "data/raw/loan_train.csv"
     model_path = "models/model.pkl"
     features_path = "models/features.pkl"
-    train_and_save(raw_csv, model_path, features_path)
+    params_path = "models/preprocess_params.pkl"
+    weights_path = "models/model_weights.pkl"
+    onnx_path = "models/model.onnx"
+    train_and_save(
+        raw_csv, model_path, features_path,
+        out_params_path=params_path, out_weights_path=weights_path, out_onnx_path=onnx_path,
+    )
@@ -0,0 +1,23 @@
+# src/utils.py
+# Shared constants with no heavy imports, so app.py can use them without pulling in
+# pandas/numba/polars through src.preprocess.
+
+# Fallback imputation values (domain defaults / training modes of the original dataset)
+DEFAULTS = {
+    'Gender': 'Male',
+    'Married': 'Yes',
+    'Dependents': '0',
+    'Credit_History': 1.0,
+    'Loan_Amount_Term': 360.0,
+}
+
+# Model input columns produced by clean_raw_df/clean_raw_lazy, in training order
+FEATURE_COLS = [
+    'Gender', 'Married', 'Dependents', 'Education', 'Self_Employed',
+    'ApplicantIncome', 'CoapplicantIncome', 'LoanAmount', 'Loan_Amount_Term', 'Credit_History',
+    'TotalIncome', 'Income_to_Loan_Ratio', 'Applicant_to_Coapp_Ratio',
+    'Property_Rural', 'Property_Semiurban', 'Property_Urban',
+]
+
+# Dependents only takes these values ('3+' -> 3); anything else falls back to the training mode
+DEP_MAP = {'0': 0, '1': 1, '2': 2, '3': 3, '3+': 3, 0: 0, 1: 1, 2: 2, 3: 3}
@@ -0,0 +1,109 @@
+# tests/test_app.py
+# /predict with micro-batching enabled must give the same answers as the unbatched path,
+# and the exported ONNX model must score like the raw weights.
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from tests.test_featurize import _random_applications  # noqa: E402
+
+JSON_HEADERS = {"content-type": "application/json"}
+
+
+@pytest.fixture(scope="module")
+def api():
+    # app.py loads models/ relative to the working directory
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        import app
+    finally:
+        os.chdir(cwd)
+    return app
+
+
+def _json_bodies(n, seed):
+    """Random applications encoded with the stdlib encoder, which writes NaN (httpx's json= refuses it)."""
+    return [json.dumps(raw) for raw in _random_applications(n, seed=seed)]
+
+
+async def _predict_all(api, bodies, batch_size, batch_timeout_ms=0.0):
+    """POST every body concurrently with a cold cache and the given batch settings."""
+    api.BATCH_SIZE = batch_size
+    api.BATCH_TIMEOUT_MS = batch_timeout_ms
+    api._cache.clear()
+    await api._start_batcher()
+    try:
+        transport = httpx.ASGITransport(app=api.app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.post("/predict", content=body, headers=JSON_HEADERS) for body in bodies))
+    finally:
+        await api._stop_batcher()
+        api._queue = None
+        api._batcher_task = None
+        api._cache.clear()
+
+
+@pytest.fixture
+def batch_settings(api):
+    saved = api.BATCH_SIZE, api.BATCH_TIMEOUT_MS, api._score
+    yield
+    api.BATCH_SIZE, api.BATCH_TIMEOUT_MS, api._score = saved
+
+
+def test_batched_matches_unbatched(api, batch_settings):
+    bodies = _json_bodies(100, seed=1)
+
+    batch_rows = []
+    score = api._score
+
+    def recording_score(X):
+        batch_rows.append(len(X))
+        return score(X)
+
+    api._score = recording_score
+    unbatched = asyncio.run(_predict_all(api, bodies, batch_size=1))
+    batch_rows.clear()
+    batched = asyncio.run(_predict_all(api, bodies, batch_size=16, batch_timeout_ms=50))
+
+    # the batcher really scored several requests per call
+    assert max(batch_rows) > 1
+    assert all(r.status_code == 200 for r in unbatched + batched)
+    for single, batch in zip(unbatched, batched):
+        assert single.json()["prediction"] == batch.json()["prediction"]
+        assert single.json()["probability"] == pytest.approx(batch.json()["probability"], rel=1e-6)
+
+
+def test_batched_score_error_is_returned(api, batch_settings):
+    def failing_score(X):
+        raise RuntimeError("scoring failed")
+
+    api._score = failing_score
+    bodies = _json_bodies(20, seed=2)
+    # a hung future would make this time out instead of returning
+    responses = asyncio.run(asyncio.wait_for(_predict_all(api, bodies, batch_size=8), timeout=10))
+
+    assert [r.status_code for r in responses] == [500] * len(bodies)
+    assert not api._cache
+
+
+def test_onnx_matches_weights(api):
+    ort = pytest.importorskip("onnxruntime")
+    session = ort.InferenceSession(str(ROOT / "models" / "model.onnx"), providers=["CPUExecutionProvider"])
+
+    X = np.stack([
+        api.featurize(api.LoanApplication(**raw), api.params, np.empty((1, api.N_FEATURES), dtype=np.float32))[0]
+        for raw in _random_applications(200, seed=3)
+    ])
+    expected = 0.5 * (1.0 + np.tanh(0.5 * (X @ api.COEF + api.INTERCEPT)))
+
+    np.testing.assert_allclose(session.run(None, {"X": X})[1][:, 1], expected, rtol=1e-4, atol=1e-6)
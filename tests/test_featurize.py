@@ -0,0 +1,63 @@
+# tests/test_featurize.py
+# app.featurize re-implements clean_raw_df for single requests; keep the two in sync.
+import itertools
+import os
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.preprocess import clean_raw_df  # noqa: E402
+from src.utils import FEATURE_COLS  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def api():
+    # app.py loads models/ relative to the working directory
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        import app
+    finally:
+        os.chdir(cwd)
+    return app
+
+
+def _random_applications(n, seed=0):
+    rng = random.Random(seed)
+    for i in range(n):
+        yield {
+            'Loan_ID': f'LP{i:06d}',
+            'Gender': rng.choice(['Male', 'Female', '']),
+            'Married': rng.choice(['Yes', 'No', '']),
+            'Dependents': rng.choice(['0', '1', '2', '3+', '', '7', None]),
+            'Education': rng.choice(['Graduate', 'Not Graduate', '']),
+            'Self_Employed': rng.choice(['Yes', 'No', '']),
+            'ApplicantIncome': rng.choice([0, 150, 5000, 40000, 90000, float('nan')]),
+            'CoapplicantIncome': rng.choice([0, 1500.5, 20000, float('nan')]),
+            'LoanAmount': rng.choice([None, 0, 9, 128, 700, float('nan')]),
+            'Loan_Amount_Term': rng.choice([None, 0, 180, 360, float('nan')]),
+            'Credit_History': rng.choice([None, 0.0, 1.0, float('nan')]),
+            'Property_Area': rng.choice(['Urban', 'Semiurban', 'Rural', '']),
+        }
+
+
+def test_feature_order_matches_saved_list(api):
+    assert api.feature_cols == FEATURE_COLS
+
+
+@pytest.mark.parametrize("raw", list(_random_applications(300)), ids=itertools.count())
+def test_featurize_matches_clean_raw_df(api, raw):
+    application = api.LoanApplication(**raw)
+    got = api.featurize(application, api.params, np.empty((1, api.N_FEATURES), dtype=np.float32))
+
+    df = pd.DataFrame([application.model_dump()])
+    expected = clean_raw_df(df, api.params)[api.feature_cols].to_numpy(dtype=np.float64)
+
+    np.testing.assert_allclose(got, expected, rtol=1e-6)
@@ -0,0 +1,44 @@
+# tests/test_preprocess.py
+# The pandas and polars training engines must fit the same params and clean to the same frame.
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.preprocess import (  # noqa: E402
+    POLARS_FLOAT_COLS, clean_raw_df, clean_raw_lazy, fit_preprocess_params, fit_preprocess_params_polars,
+)
+
+pl = pytest.importorskip("polars")
+pytest.importorskip("pyarrow")
+
+TRAIN_CSV = ROOT / "data" / "raw" / "loan_train.csv"
+
+
+@pytest.fixture(scope="module")
+def raw_frames():
+    return (
+        pd.read_csv(TRAIN_CSV),
+        pl.read_csv(TRAIN_CSV, schema_overrides={c: pl.Float64 for c in POLARS_FLOAT_COLS}),
+    )
+
+
+def test_params_match(raw_frames):
+    raw_pd, raw_pl = raw_frames
+    assert fit_preprocess_params_polars(raw_pl) == fit_preprocess_params(raw_pd)
+
+
+def test_clean_frames_match(raw_frames):
+    raw_pd, raw_pl = raw_frames
+    params = fit_preprocess_params(raw_pd)
+    expected = clean_raw_df(raw_pd, params)
+    got = clean_raw_lazy(raw_pl.lazy(), params).collect().to_pandas()
+
+    assert list(got.columns) == list(expected.columns)
+    for col in expected.columns.drop('Loan_ID'):
+        np.testing.assert_allclose(got[col].to_numpy(float), expected[col].to_numpy(float), err_msg=col)